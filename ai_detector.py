@@ -1,59 +1,387 @@
 import argparse
+import hashlib
+import logging
+import os
+import queue
 import re
 import sys
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
 
+import numpy as np
+import torch
 from docx import Document
-from transformers import pipeline
+from lxml import etree
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+log = logging.getLogger("ai_detector")
+
+_MODEL_ID = "roberta-base-openai-detector"
+
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\n+')
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = f"{_W}body"
+_W_P = f"{_W}p"
+_W_R = f"{_W}r"
+_W_HYPERLINK = f"{_W}hyperlink"
+_W_T = f"{_W}t"
+_W_BR = f"{_W}br"
+_W_TYPE = f"{_W}type"
+# Run children and their plain-text equivalents, as rendered by python-docx.
+_W_RUN_TEXT = {
+    f"{_W}tab": '\t',
+    f"{_W}ptab": '\t',
+    f"{_W}cr": '\n',
+    f"{_W}noBreakHyphen": '-',
+}
+
+_ANALYSIS_CACHE_SIZE = 256
+_analysis_cache: OrderedDict[bytes, dict] = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+# Without `detailed`, skip the per-sentence pass for confidently human texts
+# and for texts too long for a sentence breakdown to be worth its cost.
+_SKIP_SENTENCES_HUMAN_SCORE = 95.0
+_MAX_SENTENCES = 256
+
+# The model only sees the first 512 tokens of the document, which is well
+# under this many characters; slicing first keeps the tokenizer from
+# scanning the rest of a huge paste.
+_HARD_CHAR_CAP = 4096
+
 
 @lru_cache(maxsize=1)
 def _load_detector_pipe():
-    print("Loading Model... (First time it will take time)")
-    return pipeline("text-classification", model="roberta-base-openai-detector")
+    log.info("Loading Model... (First time it will take time)")
+    tokenizer = AutoTokenizer.from_pretrained(_MODEL_ID, use_fast=True)
+    if os.environ.get("AID_BACKEND") == "onnx":
+        return _load_onnx_detector(tokenizer)
+
+    use_cuda = torch.cuda.is_available()
+    device = torch.device("cuda:0" if use_cuda else "cpu")
+    model = AutoModelForSequenceClassification.from_pretrained(
+        _MODEL_ID,
+        dtype=torch.float16 if use_cuda else torch.float32,
+    ).to(device).eval()
+    if not use_cuda and os.environ.get("AID_QUANTIZE", "1") == "1":
+        model = _quantize_for_cpu(model)
+    if os.environ.get("AID_COMPILE") == "1":
+        model = torch.compile(model, mode="reduce-overhead", fullgraph=False)
+    return _Detector(model, tokenizer, device)
+
+
+def _quantize_for_cpu(model):
+    try:
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8)
+    except RuntimeError as exc:
+        # No quantized engine on this platform; keep the FP32 model.
+        log.warning("INT8 quantization unavailable, using FP32 model: %s", exc)
+        return model
+
+
+class _Detector:
+    # Stands in for the HF text-classification pipeline: fast tokenizer ->
+    # model -> softmax, without the pipeline's per-call overhead.
+    return_tensors = "pt"
+
+    def __init__(self, model, tokenizer, device=None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.id2label = model.config.id2label
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def __call__(self, texts, batch_size=1, truncation=True, max_length=512):
+        if isinstance(texts, str):
+            texts = [texts]
+        batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+
+        # All tokenization goes through one helper thread: the next batch is
+        # encoded while the current one runs, and the tokenizer (not safe for
+        # concurrent use) is never shared between callers.
+        pool = self._tokenizer_pool()
+        pending = [pool.submit(self._tokenize, batch, truncation, max_length) for batch in batches]
+
+        results = []
+        for encoded in pending:
+            for row in self._probabilities(encoded.result()):
+                best = int(row.argmax())
+                results.append({'label': self.id2label[best], 'score': float(row[best])})
+        return results
+
+    def _tokenizer_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            # Executor threads do not survive fork(), so each process gets its own.
+            if self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-detector-tokenizer")
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _tokenize(self, texts, truncation, max_length):
+        return self.tokenizer(
+            texts,
+            padding=True,
+            truncation=truncation,
+            max_length=max_length,
+            return_tensors=self.return_tensors,
+        )
+
+    def _probabilities(self, encoded) -> np.ndarray:
+        with torch.inference_mode():
+            logits = self.model(**encoded.to(self.device)).logits
+        return torch.softmax(logits.float(), dim=-1).cpu().numpy()
+
+
+class _OnnxDetector(_Detector):
+    # Same interface, but runs the exported graph in ONNX Runtime on numpy inputs.
+    return_tensors = "np"
+
+    def _probabilities(self, encoded) -> np.ndarray:
+        logits = self.model(**encoded).logits
+        probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return probs / probs.sum(axis=-1, keepdims=True)
+
+
+def _load_onnx_detector(tokenizer) -> _OnnxDetector:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    export_dir = Path(os.environ.get("AID_ONNX_DIR", ".onnx/roberta-base-openai-detector"))
+    if export_dir.exists():
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+    else:
+        model = ORTModelForSequenceClassification.from_pretrained(_MODEL_ID, export=True)
+        model.save_pretrained(export_dir)
+    return _OnnxDetector(model, tokenizer)
+
+
+def warm_up_detector() -> None:
+    # Load (and compile, if enabled) ahead of time so the first request
+    # does not pay for model loading and graph tracing.
+    pipe = _load_detector_pipe()
+    pipe("warmup", truncation=True, max_length=512)
+
+
+@lru_cache(maxsize=1)
+def _default_batch_size() -> int:
+    batch_size = os.environ.get("AID_BATCH")
+    if batch_size and batch_size.isdigit() and int(batch_size) >= 1:
+        return int(batch_size)
+    return 32 if torch.cuda.is_available() else 8
+
+
+class _RequestBatcher:
+    # Collects classification jobs from concurrent callers and runs them as
+    # one pipeline call, so parallel web requests share forward passes.
+    def __init__(self, max_texts: int, window: float):
+        self.max_texts = max_texts
+        self.window = window
+        self._lock = threading.Lock()
+        self._jobs = None
+        self._pid = None
+
+    def submit(self, texts: list[str]) -> list[dict]:
+        if len(texts) > self.max_texts:
+            # Too large to share a batch; run it on the caller's thread so it
+            # does not hold up everyone queued behind it.
+            return _run_classifier(texts)
+        future = Future()
+        self._ensure_worker().put((texts, future))
+        return future.result()
+
+    def _ensure_worker(self) -> queue.Queue:
+        with self._lock:
+            # Threads do not survive fork(), so each worker process starts its own.
+            if self._pid != os.getpid():
+                self._jobs = queue.Queue()
+                self._pid = os.getpid()
+                threading.Thread(
+                    target=self._run, args=(self._jobs,), name="ai-detector-batcher", daemon=True,
+                ).start()
+            return self._jobs
+
+    def _run(self, jobs: queue.Queue) -> None:
+        held = None
+        while True:
+            batch = [held if held is not None else jobs.get()]
+            held = None
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.window
+            while size < self.max_texts:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = jobs.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if size + len(job[0]) > self.max_texts:
+                    # Doesn't fit; it starts the next batch instead.
+                    held = job
+                    break
+                batch.append(job)
+                size += len(job[0])
+
+            try:
+                results = _run_classifier([text for texts, _ in batch for text in texts])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            start = 0
+            for texts, future in batch:
+                future.set_result(results[start:start + len(texts)])
+                start += len(texts)
+
+
+_request_batcher: _RequestBatcher | None = None
+
+
+def enable_request_batching(max_texts: int = 16, window: float = 0.01) -> None:
+    global _request_batcher
+    _request_batcher = _RequestBatcher(max_texts, window)
+
+
+def _classify(texts: list[str], batch_size: int | None = None) -> list[dict]:
+    if batch_size is None and _request_batcher is not None:
+        return _request_batcher.submit(texts)
+    return _run_classifier(texts, batch_size)
+
 
+def _run_classifier(texts: list[str], batch_size: int | None = None) -> list[dict]:
+    if batch_size is None:
+        batch_size = _default_batch_size()
 
-def analyze_text(text: str) -> dict:
     pipe = _load_detector_pipe()
-    result = pipe(text, truncation=True, max_length=512)
-    label = result[0]['label']  # 'Real' (Human) किंवा 'Fake' (AI)
-    score = result[0]['score'] * 100
+    # Batch similar lengths together so each batch pads to a shorter sequence.
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    sorted_results = pipe(
+        [texts[i] for i in order],
+        batch_size=batch_size,
+        truncation=True,
+        max_length=512,
+    )
+    results = [None] * len(texts)
+    for idx, result in zip(order, sorted_results):
+        results[idx] = result
+    return results
+
+
+def _sentence_rows(sentences: list[str], results: list[dict]) -> list[dict]:
+    return [
+        {
+            'sentence': sentence,
+            'label': result['label'],
+            'score': result['score'] * 100,
+            'originality': 100.0 - (result['score'] * 100),
+        }
+        for sentence, result in zip(sentences, results)
+    ]
+
+
+def _text_key(text: str, detailed: bool) -> bytes:
+    digest = hashlib.blake2b(text.encode(), digest_size=16)
+    digest.update(b'\x01' if detailed else b'\x00')
+    return digest.digest()
+
+
+def analyze_text(text: str, detailed: bool = False) -> dict:
+    # The web flow analyzes a text and then re-submits it for the PDF report,
+    # so remember recent results instead of running the model twice.
+    key = _text_key(text, detailed)
+    with _analysis_cache_lock:
+        cached = _analysis_cache.get(key)
+        if cached is not None:
+            _analysis_cache.move_to_end(key)
+            return _copy_analysis(cached)
+
+    analysis = _analyze_uncached(text, detailed)
+    with _analysis_cache_lock:
+        _analysis_cache[key] = _copy_analysis(analysis)
+        if len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return analysis
+
+
+def _copy_analysis(analysis: dict) -> dict:
+    # Callers own the dict they get back, so the cached entry must not be shared.
+    return {
+        **analysis,
+        'sentences': [dict(row) for row in analysis['sentences']],
+        'paragraphs': list(analysis['paragraphs']),
+    }
+
+
+def _analyze_uncached(text: str, detailed: bool) -> dict:
+    sentences = _split_sentences(text)
+    document = text[:_HARD_CHAR_CAP]
+    if detailed and sentences:
+        # The verdict is derived from the sentence scores, so the full
+        # document never needs its own forward pass.
+        sentence_results = _classify(sentences)
+        doc_result = _aggregate_sentence_results(sentences, sentence_results)
+    else:
+        doc_result = _classify([document])[0]
+        strongly_human = (
+            doc_result['label'] == 'Real'
+            and doc_result['score'] * 100 > _SKIP_SENTENCES_HUMAN_SCORE
+        )
+        if strongly_human or len(sentences) > _MAX_SENTENCES:
+            sentences = []
+        sentence_results = _classify(sentences) if sentences else []
+
+    label = doc_result['label']  # 'Real' (Human) किंवा 'Fake' (AI)
+    score = doc_result['score'] * 100
     return {
         'label': label,
         'score': score,
         'originality': 100.0 - score,
         'text': text,
-        'sentences': analyze_sentences(text),
+        'sentences': _sentence_rows(sentences, sentence_results),
         'paragraphs': _paragraphs_from_text(text),
     }
 
 
+def _aggregate_sentence_results(sentences: list[str], results: list[dict]) -> dict:
+    # Length-weighted mean of each sentence's probability of being AI-written,
+    # returned in the same label/score shape as a single classifier result.
+    weighted = 0.0
+    total = 0
+    for sentence, result in zip(sentences, results):
+        fake_probability = result['score'] if result['label'] == 'Fake' else 1.0 - result['score']
+        weighted += len(sentence) * fake_probability
+        total += len(sentence)
+    fake_probability = weighted / total
+    if fake_probability >= 0.5:
+        return {'label': 'Fake', 'score': fake_probability}
+    return {'label': 'Real', 'score': 1.0 - fake_probability}
+
+
 def _split_sentences(text: str) -> list[str]:
-    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
-    return sentences
+    return [s for s in map(str.strip, _SENTENCE_BOUNDARY_RE.split(text)) if s]
 
 
-def analyze_sentences(text: str) -> list[dict]:
+def analyze_sentences(text: str, batch_size: int | None = None) -> list[dict]:
     sentences = _split_sentences(text)
     if not sentences:
         return []
 
-    pipe = _load_detector_pipe()
-    results = pipe(sentences, truncation=True, max_length=512)
-    return [
-        {
-            'sentence': sentences[idx],
-            'label': result['label'],
-            'score': result['score'] * 100,
-            'originality': 100.0 - (result['score'] * 100),
-        }
-        for idx, result in enumerate(results)
-    ]
+    return _sentence_rows(sentences, _classify(sentences, batch_size))
 
 
 def _paragraphs_from_text(text: str) -> list[str]:
-    return [p.strip() for p in text.split('\n\n') if p.strip()]
+    return [p for p in map(str.strip, _PARAGRAPH_BREAK_RE.split(text)) if p]
 
 
 def detect_ai_content(text: str) -> dict:
@@ -61,20 +389,20 @@ def detect_ai_content(text: str) -> dict:
     score = analysis['score']
     label = analysis['label']
 
-    print("\n--- Analysis Result ---")
+    log.info("\n--- Analysis Result ---")
     if label == 'Fake':
-        print("🔴 ALERT: This text is likely AI Generated!")
-        print(f"Confidence Score: {score:.2f}%")
+        log.info("🔴 ALERT: This text is likely AI Generated!")
+        log.info("Confidence Score: %.2f%%", score)
 
         if score > 98:
-            print("Possible Source: High probability of GPT-4 or Claude (Very structured)")
+            log.info("Possible Source: High probability of GPT-4 or Claude (Very structured)")
         elif score > 90:
-            print("Possible Source: ChatGPT (GPT-3.5) or Gemini")
+            log.info("Possible Source: ChatGPT (GPT-3.5) or Gemini")
         else:
-            print("Possible Source: Basic AI tool or Paraphrasing tool")
+            log.info("Possible Source: Basic AI tool or Paraphrasing tool")
     else:
-        print("🟢 This text looks Human Written.")
-        print(f"Confidence Score: {score:.2f}%")
+        log.info("🟢 This text looks Human Written.")
+        log.info("Confidence Score: %.2f%%", score)
 
     return analysis
 
@@ -84,14 +412,78 @@ def _text_from_document(document: Document) -> str:
     return '\n'.join(paragraphs)
 
 
+def _paragraph_text(paragraph) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == _W_R:
+            runs = (child,)
+        elif child.tag == _W_HYPERLINK:
+            runs = child.iterchildren(_W_R)
+        else:
+            continue
+        for run in runs:
+            for node in run:
+                if node.tag == _W_T:
+                    parts.append(node.text or '')
+                elif node.tag == _W_BR:
+                    if node.get(_W_TYPE, 'textWrapping') == 'textWrapping':
+                        parts.append('\n')
+                elif node.tag in _W_RUN_TEXT:
+                    parts.append(_W_RUN_TEXT[node.tag])
+    return ''.join(parts)
+
+
+def _iter_docx_paragraphs(source):
+    # Read-only fast path: stream word/document.xml out of the archive and
+    # yield each non-empty body paragraph, discarding parsed elements as we
+    # go so memory stays flat regardless of document size.
+    with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+        for _, element in etree.iterparse(xml, events=("end",), tag=_W_P):
+            parent = element.getparent()
+            if parent.tag != _W_BODY:
+                # Table cells, text boxes etc. are not part of document.paragraphs.
+                continue
+            text = _paragraph_text(element)
+            if text.strip():
+                yield text
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def _read_docx(source) -> str:
+    try:
+        return '\n'.join(_iter_docx_paragraphs(source))
+    except (KeyError, etree.XMLSyntaxError):
+        # Unusual package layout; let python-docx resolve the main part.
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return _text_from_document(Document(source))
+
+
 def read_docx_file(path: Path) -> str:
-    document = Document(path)
-    return _text_from_document(document)
+    return _read_docx(path)
+
+
+def read_docx_bytes(contents: bytes | bytearray | memoryview) -> str:
+    # BytesIO shares the buffer of a bytes object instead of copying it; other
+    # buffer types are copied once. Prefer read_docx_stream for uploads.
+    return _read_docx(BytesIO(contents))
+
+
+def read_docx_stream(stream) -> str:
+    # `stream` must be a seekable binary file object, e.g. an upload's stream.
+    return _read_docx(stream)
 
 
-def read_docx_bytes(contents: bytes) -> str:
-    document = Document(BytesIO(contents))
-    return _text_from_document(document)
+def _log_to_stdout() -> None:
+    # The CLI's verdict is its output: send this module's INFO messages to
+    # stdout without raising the level of every other library's logger.
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
 
 
 def main():
@@ -108,6 +500,7 @@ def main():
         type=Path,
     )
     args = parser.parse_args()
+    _log_to_stdout()
 
     if args.doc:
         if not args.doc.exists():
@@ -0,0 +1,216 @@
+import logging
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+import torch
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+import ai_detector
+
+
+@pytest.fixture(autouse=True)
+def _fresh_batch_size():
+    ai_detector._default_batch_size.cache_clear()
+    yield
+    ai_detector._default_batch_size.cache_clear()
+
+
+def _device_default() -> int:
+    return 32 if torch.cuda.is_available() else 8
+
+
+def test_batch_size_from_environment(monkeypatch):
+    monkeypatch.setenv("AID_BATCH", "4")
+    assert ai_detector._default_batch_size() == 4
+
+
+@pytest.mark.parametrize("value", ["0", "-3", "abc", ""])
+def test_invalid_batch_size_falls_back_to_device_default(monkeypatch, value):
+    monkeypatch.setenv("AID_BATCH", value)
+    assert ai_detector._default_batch_size() == _device_default()
+
+
+def test_cached_analysis_is_not_shared_between_callers(monkeypatch):
+    monkeypatch.setattr(ai_detector, "_analysis_cache", ai_detector.OrderedDict())
+    monkeypatch.setattr(
+        ai_detector, "_classify",
+        lambda texts, batch_size=None: [{'label': 'Fake', 'score': 0.9} for _ in texts],
+    )
+    text = "First sentence. Second sentence!"
+
+    first = ai_detector.analyze_text(text, detailed=True)
+    first['label'] = 'Real'
+    first['sentences'].clear()
+
+    second = ai_detector.analyze_text(text, detailed=True)
+    second['sentences'][0]['label'] = 'Real'
+
+    third = ai_detector.analyze_text(text, detailed=True)
+    assert third['label'] == 'Fake'
+    assert [row['label'] for row in third['sentences']] == ['Fake', 'Fake']
+
+
+def test_cli_prints_verdict_to_stdout_without_enabling_other_loggers(monkeypatch, capsys):
+    monkeypatch.setattr(ai_detector, "_analysis_cache", ai_detector.OrderedDict())
+    monkeypatch.setattr(
+        ai_detector, "_classify",
+        lambda texts, batch_size=None: [{'label': 'Real', 'score': 0.99} for _ in texts],
+    )
+    monkeypatch.setattr(sys, "argv", ["ai_detector.py", "--text", "Plainly human."])
+    handlers = list(ai_detector.log.handlers)
+    try:
+        ai_detector.main()
+    finally:
+        ai_detector.log.handlers[:] = handlers
+        ai_detector.log.setLevel(logging.NOTSET)
+        ai_detector.log.propagate = True
+
+    captured = capsys.readouterr()
+    assert "This text looks Human Written." in captured.out
+    assert "Confidence Score: 99.00%" in captured.out
+    assert captured.err == ""
+    assert logging.getLogger("httpx").getEffectiveLevel() == logging.WARNING
+
+
+def test_request_batcher_limits_batches_by_text_count(monkeypatch):
+    calls = []
+
+    def fake_run_classifier(texts, batch_size=None):
+        calls.append((threading.current_thread().name, len(texts)))
+        time.sleep(0.02)
+        return [{'label': text, 'score': 1.0} for text in texts]
+
+    monkeypatch.setattr(ai_detector, "_run_classifier", fake_run_classifier)
+    batcher = ai_detector._RequestBatcher(max_texts=8, window=0.05)
+    jobs = [[f"{job}-{index}" for index in range(3)] for job in range(10)] + [["big"] * 20]
+
+    with ThreadPoolExecutor(len(jobs)) as pool:
+        results = list(pool.map(batcher.submit, jobs))
+
+    for texts, result in zip(jobs, results):
+        assert [row['label'] for row in result] == texts
+    batched = [size for thread, size in calls if thread == "ai-detector-batcher"]
+    assert batched and max(batched) <= 8
+    assert ("ai-detector-batcher", 20) not in calls
+    assert 20 in [size for _, size in calls]
+
+
+def _sample_docx() -> bytes:
+    document = Document()
+    document.add_paragraph("Opening line.\tAfter a tab.")
+    paragraph = document.add_paragraph("Soft")
+    run = paragraph.add_run()
+    run.add_break()
+    run.add_text("after soft break")
+    run.add_break(WD_BREAK.PAGE)
+    run.add_text("after page break")
+    document.add_paragraph("   ")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Inside a table cell."
+
+    paragraph = document.add_paragraph("Visit ")
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), "rId99")
+    link_run = OxmlElement("w:r")
+    link_text = OxmlElement("w:t")
+    link_text.text = "the link"
+    link_run.append(link_text)
+    hyperlink.append(link_run)
+    paragraph._p.append(hyperlink)
+    paragraph.add_run(" today.")
+
+    for index in range(3000):
+        document.add_paragraph(f"Paragraph {index} with some filler text.")
+    contents = BytesIO()
+    document.save(contents)
+    return contents.getvalue()
+
+
+def test_docx_reader_matches_python_docx():
+    data = _sample_docx()
+    expected = ai_detector._text_from_document(Document(BytesIO(data)))
+
+    assert "the link" in expected
+    assert ai_detector.read_docx_bytes(data) == expected
+    assert ai_detector.read_docx_bytes(bytearray(data)) == expected
+    assert ai_detector.read_docx_bytes(memoryview(data)) == expected
+
+    with tempfile.SpooledTemporaryFile(max_size=1024) as upload:
+        upload.write(data)
+        upload.seek(0)
+        assert ai_detector.read_docx_stream(upload) == expected
+
+
+def test_docx_reader_falls_back_to_python_docx_for_other_layouts():
+    renamed = BytesIO()
+    with zipfile.ZipFile(BytesIO(_sample_docx())) as source, zipfile.ZipFile(renamed, "w") as target:
+        for info in source.infolist():
+            data = source.read(info.filename)
+            name = info.filename
+            if name == "word/document.xml":
+                name = "word/main.xml"
+            elif name in ("[Content_Types].xml", "_rels/.rels"):
+                data = data.replace(b"word/document.xml", b"word/main.xml")
+            target.writestr(name, data)
+    data = renamed.getvalue()
+
+    expected = ai_detector._text_from_document(Document(BytesIO(data)))
+    assert expected.startswith("Opening line.")
+    assert ai_detector.read_docx_bytes(data) == expected
+
+
+def _detailed_verdict(monkeypatch, rows: dict) -> dict:
+    monkeypatch.setattr(ai_detector, "_analysis_cache", ai_detector.OrderedDict())
+
+    def fake_classify(texts, batch_size=None):
+        assert list(texts) == list(rows), "detailed analysis should only classify sentences"
+        return [rows[text] for text in texts]
+
+    monkeypatch.setattr(ai_detector, "_classify", fake_classify)
+    return ai_detector.analyze_text(" ".join(rows), detailed=True)
+
+
+def test_detailed_verdict_is_length_weighted(monkeypatch):
+    analysis = _detailed_verdict(monkeypatch, {
+        "Nine letters.": {'label': 'Fake', 'score': 0.9},  # 13 chars, P(Fake) 0.9
+        "Tiny.": {'label': 'Real', 'score': 0.8},  # 5 chars, P(Fake) 0.2
+    })
+    assert analysis['label'] == 'Fake'
+    assert analysis['score'] == pytest.approx((13 * 90 + 5 * 20) / 18)
+    assert analysis['originality'] == pytest.approx(100 - analysis['score'])
+    assert [row['label'] for row in analysis['sentences']] == ['Fake', 'Real']
+
+
+def test_detailed_verdict_weights_characters_not_sentence_count(monkeypatch):
+    analysis = _detailed_verdict(monkeypatch, {
+        "Ok.": {'label': 'Fake', 'score': 0.9},
+        "Hm.": {'label': 'Fake', 'score': 0.9},
+        "This much longer sentence reads like a person wrote it.": {'label': 'Real', 'score': 0.9},
+    })
+    assert analysis['label'] == 'Real'
+    assert analysis['score'] == pytest.approx(100 - (3 * 90 + 3 * 90 + 55 * 10) / 61)
+
+
+def test_detailed_verdict_cutoff_at_one_half(monkeypatch):
+    at_cutoff = _detailed_verdict(monkeypatch, {
+        "Same size.": {'label': 'Fake', 'score': 0.75},
+        "Also size.": {'label': 'Real', 'score': 0.75},
+    })
+    assert at_cutoff['label'] == 'Fake'
+    assert at_cutoff['score'] == pytest.approx(50.0)
+
+    below_cutoff = _detailed_verdict(monkeypatch, {
+        "Same size.": {'label': 'Fake', 'score': 0.75},
+        "Also size.": {'label': 'Real', 'score': 0.76},
+    })
+    assert below_cutoff['label'] == 'Real'
+    assert below_cutoff['score'] == pytest.approx(50.5)
@@ -0,0 +1,108 @@
+import base64
+import html
+import re
+import time
+import zlib
+from io import BytesIO
+
+import pytest
+from docx import Document
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph
+
+import ai_detector
+from webapp import _BODY_STYLE, _create_pdf_report, _report_chunks, app
+
+
+def _page_count(buffer) -> int:
+    return buffer.getvalue().count(b'/Type /Page\n')
+
+
+def _page_content(pdf: bytes) -> bytes:
+    streams = re.findall(rb'stream\r?\n(.*?)endstream', pdf, re.DOTALL)
+    return b''.join(zlib.decompress(base64.a85decode(stream.strip(), adobe=True)) for stream in streams)
+
+
+def test_report_splits_paragraph_longer_than_a_page():
+    buffer = _create_pdf_report({'label': 'Real', 'score': 50.0, 'text': 'word ' * 5000})
+    assert _page_count(buffer) > 1
+
+
+def test_report_layout_stays_linear_for_a_single_long_line():
+    started = time.perf_counter()
+    buffer = _create_pdf_report({'label': 'Real', 'score': 50.0, 'text': 'word ' * 80000})
+    assert time.perf_counter() - started < 5
+    assert _page_count(buffer) > 50
+
+
+def test_report_chunks_are_bounded():
+    line = 'x' * 6000 + ' Short sentence. ' + 'Another one! ' * 500
+    chunks = list(_report_chunks(line))
+    assert max(len(chunk) for chunk in chunks) <= 2500
+    assert ''.join(chunks).replace(' ', '') == line.replace(' ', '')
+
+
+def test_long_unbroken_token_stays_inside_the_margin():
+    width = 515
+    paragraph = Paragraph('see https://example.com/' + 'a' * 400, _BODY_STYLE)
+    paragraph.wrap(width, 10000)
+    for line in paragraph.blPara.lines:
+        assert stringWidth(' '.join(line[1]), 'Helvetica', 10) <= width
+
+
+def test_report_for_empty_text_has_header_page():
+    buffer = _create_pdf_report({'label': 'Real', 'score': 50.0, 'text': ''})
+    assert _page_count(buffer) == 1
+
+
+def _fake_classify(calls):
+    def fake_classify(texts, batch_size=None):
+        calls.append(texts)
+        return [
+            {'label': 'Fake', 'score': 0.9} if text.endswith('.') else {'label': 'Real', 'score': 0.6}
+            for text in texts
+        ]
+    return fake_classify
+
+
+@pytest.mark.parametrize("query", ["", "?detailed=1"])
+def test_report_matches_the_analysis_shown_on_the_page(monkeypatch, query):
+    calls = []
+    monkeypatch.setattr(ai_detector, "_analysis_cache", ai_detector.OrderedDict())
+    monkeypatch.setattr(ai_detector, "_classify", _fake_classify(calls))
+    client = app.test_client()
+
+    page = client.post(f"/{query}", data={'text': 'A long first sentence. Short!'}).get_data(as_text=True)
+    label = re.search(r'<div class="badge">(\w+)</div>', page).group(1)
+    score = re.search(r'<strong>Confidence:</strong> ([\d.]+)%', page).group(1)
+    action = re.search(r'<form action="([^"]+)" method="post" class="report-form">', page).group(1)
+    text = html.unescape(re.search(r'name="text" value="([^"]*)"', page).group(1))
+    calls_for_page = len(calls)
+
+    pdf = _page_content(client.post(action, data={'text': text}).get_data())
+    assert len(calls) == calls_for_page
+    assert f"Result: {label}".encode() in pdf
+    assert f"Confidence: {float(score):.2f}%".encode() in pdf
+
+
+def test_report_for_uploaded_docx_reuses_the_cached_analysis(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_detector, "_analysis_cache", ai_detector.OrderedDict())
+    monkeypatch.setattr(ai_detector, "_classify", _fake_classify(calls))
+    document = Document()
+    document.add_paragraph("\tIndented first line of an essay.")
+    document.add_paragraph("Closing line with trailing space.  ")
+    contents = BytesIO()
+    document.save(contents)
+    contents.seek(0)
+    client = app.test_client()
+
+    page = client.post(
+        "/", data={'document': (contents, 'essay.docx'), 'text': ''},
+        content_type='multipart/form-data',
+    ).get_data(as_text=True)
+    text = html.unescape(re.search(r'name="text" value="([^"]*)"', page).group(1))
+    calls_for_page = len(calls)
+
+    assert client.post("/report", data={'text': text}).status_code == 200
+    assert len(calls) == calls_for_page
@@ -1,13 +1,42 @@
 import textwrap
 from io import BytesIO
+from xml.sax.saxutils import escape
 
-from flask import Flask, render_template_string, request, send_file
+from flask import Flask, request, send_file
 from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-
-from ai_detector import analyze_text, read_docx_bytes
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import (
+    BaseDocTemplate,
+    Frame,
+    NextPageTemplate,
+    PageTemplate,
+    Paragraph,
+    Spacer,
+)
+
+from ai_detector import (
+    _split_sentences,
+    analyze_text,
+    enable_request_batching,
+    read_docx_stream,
+    warm_up_detector,
+)
 
 app = Flask(__name__)
+# Concurrent requests are merged into shared model batches.
+enable_request_batching()
+
+_BODY_STYLE = ParagraphStyle(
+    "ReportBody",
+    parent=getSampleStyleSheet()["BodyText"],
+    fontName="Helvetica",
+    fontSize=10,
+    leading=14,
+    splitLongWords=1,
+)
+# Platypus re-wraps the whole remainder of a paragraph at every page split, so
+# long lines are broken into flowables of bounded size to keep layout linear.
+_REPORT_CHUNK_CHARS = 2500
 
 TEMPLATE = """
 <!doctype html>
@@ -75,7 +104,7 @@ TEMPLATE = """
           <summary>View snippet (first 300 chars)</summary>
           <p>{{ result.text[:300] }}{% if result.text|length > 300 %}…{% endif %}</p>
         </details>
-        <form action="/report" method="post" class="report-form">
+        <form action="/report{% if detailed %}?detailed=1{% endif %}" method="post" class="report-form">
           <input type="hidden" name="text" value="{{ submitted_text }}" />
           <button type="submit" class="report-button">Download detailed PDF report</button>
         </form>
@@ -86,6 +115,24 @@ TEMPLATE = """
 </html>
 """
 
+# Parse the template once instead of on every request.
+_TEMPLATE = app.jinja_env.from_string(TEMPLATE)
+
+
+def _normalize_text(text: str) -> str:
+    # Browsers submit form newlines as CRLF and the report form re-posts the
+    # text, so every analyzed text is normalized the same way to keep it
+    # matching the one posted back from the result page.
+    return text.replace("\r\n", "\n").strip()
+
+
+def _form_text() -> str:
+    return _normalize_text(request.form.get("text", ""))
+
+
+def _wants_detailed() -> bool:
+    return request.args.get("detailed") == "1"
+
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -95,35 +142,34 @@ def index():
 
     if request.method == "POST":
         uploaded = request.files.get("document")
-        submitted_text = request.form.get("text", "").strip()
+        submitted_text = _form_text()
 
         if uploaded and uploaded.filename:
             if not uploaded.filename.lower().endswith(".docx"):
                 error = "Please upload a .docx file."
             else:
-                contents = uploaded.read()
-                submitted_text = read_docx_bytes(contents)
+                submitted_text = _normalize_text(read_docx_stream(uploaded.stream))
         elif not submitted_text:
             error = "Provide text or upload a document."
 
         if not error:
-            result = analyze_text(submitted_text)
+            result = analyze_text(submitted_text, detailed=_wants_detailed())
 
-    return render_template_string(
-        TEMPLATE,
+    return _TEMPLATE.render(
         error=error,
         result=result,
         submitted_text=submitted_text,
+        detailed=_wants_detailed(),
     )
 
 
 @app.route("/report", methods=["POST"])
 def report():
-    text = request.form.get("text", "").strip()
+    text = _form_text()
     if not text:
         return "Text is required for report generation", 400
 
-    analysis = analyze_text(text)
+    analysis = analyze_text(text, detailed=_wants_detailed())
     pdf_bytes = _create_pdf_report(analysis)
     return send_file(
         pdf_bytes,
@@ -137,37 +183,71 @@ def _create_pdf_report(analysis: dict) -> BytesIO:
     buffer = BytesIO()
     page_width, page_height = A4
     margin = 40
-    c = canvas.Canvas(buffer, pagesize=A4)
-    y = page_height - margin
-
-    c.setFont("Helvetica-Bold", 20)
-    c.drawString(margin, y, "AI Content Detector Report")
-    y -= 30
-
-    c.setFont("Helvetica", 12)
-    c.drawString(margin, y, f"Result: {analysis['label']}")
-    y -= 16
-    c.drawString(margin, y, f"Confidence: {analysis['score']:.2f}%")
-    y -= 24
-
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(margin, y, "Analyzed Text")
-    y -= 18
-    c.setFont("Helvetica", 10)
-    for line in textwrap.wrap(analysis['text'], 90):
-        if y < margin + 20:
-            c.showPage()
-            y = page_height - margin
-            c.setFont("Helvetica", 10)
-        c.drawString(margin, y, line)
-        y -= 14
-
-    c.showPage()
-    c.save()
+    header_height = 88
+
+    def draw_header(c, doc):
+        y = page_height - margin
+        c.setFont("Helvetica-Bold", 20)
+        c.drawString(margin, y, "AI Content Detector Report")
+        y -= 30
+
+        c.setFont("Helvetica", 12)
+        c.drawString(margin, y, f"Result: {analysis['label']}")
+        y -= 16
+        c.drawString(margin, y, f"Confidence: {analysis['score']:.2f}%")
+        y -= 24
+
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(margin, y, "Analyzed Text")
+
+    def body_frame(top: float) -> Frame:
+        return Frame(
+            margin, margin, page_width - 2 * margin, top - margin,
+            leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0,
+        )
+
+    doc = BaseDocTemplate(buffer, pagesize=A4)
+    doc.addPageTemplates([
+        PageTemplate("first", [body_frame(page_height - margin - header_height)], onPage=draw_header),
+        PageTemplate("later", [body_frame(page_height - margin)]),
+    ])
+    # Platypus lays out the paragraphs and splits any that overflow a page.
+    story = [NextPageTemplate("later")]
+    story.extend(
+        Paragraph(escape(chunk), _BODY_STYLE)
+        for line in analysis['text'].splitlines()
+        for chunk in _report_chunks(line)
+    )
+    if len(story) == 1:
+        # Still emit the header page for an empty text.
+        story.append(Spacer(0, 0))
+    doc.build(story)
+
     buffer.seek(0)
     return buffer
 
 
+def _report_chunks(line: str):
+    # Group whole sentences into chunks of at most _REPORT_CHUNK_CHARS; a
+    # sentence longer than that is wrapped into pieces of that size.
+    chunk = []
+    size = 0
+    for sentence in _split_sentences(line):
+        if len(sentence) > _REPORT_CHUNK_CHARS:
+            pieces = textwrap.wrap(sentence, _REPORT_CHUNK_CHARS)
+        else:
+            pieces = [sentence]
+        for piece in pieces:
+            if chunk and size + len(piece) > _REPORT_CHUNK_CHARS:
+                yield ' '.join(chunk)
+                chunk = []
+                size = 0
+            chunk.append(piece)
+            size += len(piece) + 1
+    if chunk:
+        yield ' '.join(chunk)
+
+
 def _is_port_free(port: int) -> bool:
     import socket
 
@@ -200,6 +280,7 @@ def _get_port() -> int:
 
 
 if __name__ == "__main__":
+    warm_up_detector()
     try:
         app.run(host="0.0.0.0", port=_get_port())
     except OSError as exc:
@@ -0,0 +1,6 @@
+from ai_detector import warm_up_detector
+from webapp import app
+
+# Load the model at import time so `gunicorn --preload` does it once in the
+# master process and the forked workers share the loaded weights.
+warm_up_detector()